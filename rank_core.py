@@ -0,0 +1,383 @@
+"""Pure computation behind the word-rank app; no Streamlit in here."""
+
+import numpy as np
+import pandas as pd
+from collections import Counter
+from dataclasses import dataclass
+import functools
+import math
+import operator
+
+# Factorials repeat heavily across positions and subcases; cache them.
+_fact = functools.lru_cache(maxsize=None)(math.factorial)
+
+_SUBSCRIPT = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
+
+
+@functools.lru_cache(maxsize=None)
+def _subscript_token(letter: str, count: int) -> str:
+    """Letter with its multiplicity as a Unicode subscript, e.g. A₂."""
+    return f"{letter}{str(count).translate(_SUBSCRIPT)}" if count > 1 else letter
+
+
+# Static HTML for the classic explanation, hoisted so the per-step loop only
+# fills in the dynamic parts.
+_POOL_TMPL = """
+    <div style="font-size: 24px; font-weight: 600;">
+        <span style="color: red;">Starting at this letter and extending through all letters to its right: →</span>
+        <code>{pool}</code>
+    </div>
+    """
+
+_REMAIN_TMPL = """
+    <div style="font-size: 24px; font-weight: 600;">
+        <span style="color: blue;">Remaining letters →</span>
+        <code>{pool}</code>
+    </div>
+    """
+
+_TH_TMPL = (
+    "<th style='padding: 4px 10px; border: 1px solid #ccc; "
+    "color:#1E88E5; font-weight: normal;'>{}</th>"
+)
+
+_TD_TMPL = (
+    "<td style='text-align:center; padding: 4px 10px; "
+    "border: 1px solid #ccc;'>{}</td>"
+)
+
+_FREQ_TABLE_TMPL = (
+    """
+            <table style='border-collapse: collapse; font-size: 1.05em;'>
+              <tr>
+            """
+    "{ths}</tr><tr>{tds}</tr></table>"
+)
+
+_HR_HTML = """
+    <div style="text-align:center;">
+        <hr style="
+            width:40%;
+            margin-top:20px;
+            margin-bottom:20px;
+            border:0;
+            border-top:1px solid #d1d5db;
+        ">
+    </div>
+"""
+
+_SUBTOTAL_CARD_TMPL = """    <div style="
+        backdrop-filter: blur(14px);
+        -webkit-backdrop-filter: blur(14px);
+        background: rgba(255, 255, 255, 0.65);
+        border: 1px solid rgba(200, 200, 200, 0.45);
+        padding: 16px 22px;
+        margin: 18px 0;
+        border-radius: 14px;
+        font-size: 22px;
+        font-weight: 300;
+        font-family: -apple-system, BlinkMacSystemFont, 'SF Pro Display',
+                     'Segoe UI', Roboto, sans-serif;
+        color: #1c1c1e;
+        box-shadow: 0 4px 12px rgba(0,0,0,0.08);
+    ">
+        Subtotal contribution at position {pos}: {sub} words
+    </div>
+    """
+
+
+@dataclass
+class RankResult:
+    """All word-derived state: tidy table, rank, and prebuilt classic steps."""
+    df: pd.DataFrame
+    total_rank: int
+    total_before: int
+    steps: list
+
+
+def compute_rank(word: str) -> RankResult:
+    """Compute everything the app derives from `word`: the tidy table, the
+    rank, and the prebuilt HTML/LaTeX for every classic step."""
+    unique_sorted = sorted(set(word))
+
+    # Rank each unique letter via a byte translation table: one C-level
+    # translate over the encoded word instead of a dict hash per character.
+    tbl = bytearray(256)
+    for i, ch in enumerate(unique_sorted):
+        tbl[ord(ch)] = i + 1
+    ranks = list(word.encode("ascii").translate(bytes(tbl)))
+
+    # Count of smaller letters to the right for each position. For longer
+    # words a single broadcast comparison over an n×n int8 matrix beats the
+    # Python-level scan; below that, a Fenwick tree over the letter ranks
+    # (right-to-left) keeps it O(n log 26) with no array overhead.
+    if len(ranks) >= 32:
+        r = np.fromiter(ranks, dtype=np.int8, count=len(ranks))
+        smaller_right = np.triu(r[None, :] < r[:, None], 1).sum(axis=1).tolist()
+    else:
+        size = len(unique_sorted)
+        bit = [0] * (size + 1)
+        smaller_right = [0] * len(ranks)
+        for i in range(len(ranks) - 1, -1, -1):
+            r = ranks[i]
+            x = r - 1
+            s = 0
+            while x:
+                s += bit[x]
+                x -= x & -x
+            smaller_right[i] = s
+            x = r
+            while x <= size:
+                bit[x] += 1
+                x += x & -x
+
+    adjusted_factorials = []
+    adjusted_values = []
+    counts = Counter(word)
+    # Full multinomial n_k!/∏(f_r!) for the current slice; updated in O(1) per
+    # position below instead of recomputing the factorial quotient each time.
+    # The tidy table's (n_k - 1)!/∏(f_r!) is this divided by the slice length.
+    multinomial = _fact(len(word)) // functools.reduce(
+        operator.mul, map(_fact, counts.values()), 1
+    )
+    for i in range(len(word)):
+        num = len(word) - i - 1
+
+        denom_parts = [f"{counts[ch]}!" for ch in sorted(counts) if counts[ch] > 1]
+
+        if len(denom_parts) > 1:
+            expr = f"{num}! / ({' × '.join(denom_parts)})"
+        elif len(denom_parts) == 1:
+            expr = f"{num}! / {denom_parts[0]}"
+        else:
+            expr = f"{num}!"
+        adjusted_factorials.append(expr)
+
+        adjusted_values.append(multinomial // (len(word) - i))
+
+        if i + 1 < len(word):
+            # Dropping the leading letter multiplies the multinomial by its
+            # count and divides by the old slice length.
+            ch = word[i]
+            multinomial = multinomial * counts[ch] // (len(word) - i)
+            counts[ch] -= 1
+            if counts[ch] == 0:
+                del counts[ch]
+
+    contributions = [smaller_right[i] * adjusted_values[i] for i in range(len(word))]
+    total_rank = sum(contributions) + 1
+
+    # Build column-wise with explicit dtypes so pandas skips inference, then
+    # transpose once into the row-per-quantity layout the table displays.
+    # Text columns stay object so the transpose doesn't coerce the numeric
+    # rows to strings; contributions outgrow int64 for long words.
+    df = pd.DataFrame({
+        "Letter": pd.array(list(word), dtype="object"),
+        "Rank": pd.array(ranks, dtype="int64"),
+        "Smaller to Right": pd.array(smaller_right, dtype="int64"),
+        "Adjusted Factorial": pd.array(adjusted_factorials, dtype="object"),
+        "Contribution": pd.array(contributions, dtype="object"),
+    }).T
+
+    # ---------- Classic explanation, precomputed per step ----------
+    steps = []
+    total_before = 0
+
+    # One Counter maintained across positions: retire the letter that left
+    # the slice instead of recounting the whole tail every step.
+    counts = Counter(word)
+
+    for i in range(len(word)):
+        current = word[i]
+        if i:
+            prev = word[i - 1]
+            counts[prev] -= 1
+            if counts[prev] == 0:
+                del counts[prev]
+        # The tidy table already knows whether anything smaller sits to the
+        # right; skip the pool/frequency-table work for dead positions.
+        if smaller_right[i] == 0:
+            steps.append({
+                "title": f"Step {i+1} — Letter {current} (No Small Letters to the Right)",
+                "body_md": "No smaller letters to the right → **Contribution = 0.**",
+                "subcase_latex": None,
+                "tail_md": None,
+            })
+            continue
+
+        right_slice = word[i:]
+
+        smaller_letters = sorted(set(c for c in right_slice if c < current))
+
+        title = f"Step {i+1} — Letter {current} (smaller letters: {', '.join(smaller_letters)})"
+
+        position_md = f"**Position {i+1}:** Current letter is **{current}**.  \n"
+
+        # Sorted key set and pool tokens for this step; subcases below reuse
+        # them since only the placed letter's multiplicity changes.
+        sorted_keys = sorted(counts.keys())
+        tokens = {ch: _subscript_token(ch, counts[ch]) for ch in sorted_keys}
+
+        display_str = " ".join(tokens[ch] for ch in sorted_keys)
+
+        pool_html = _POOL_TMPL.format(pool=display_str)
+
+        ths = "".join(_TH_TMPL.format(ch) for ch in sorted_keys)
+        tds = "".join(_TD_TMPL.format(counts[ch]) for ch in sorted_keys)
+        freq_html = _FREQ_TABLE_TMPL.format(ths=ths, tds=tds)
+
+        common_items = [(ch, counts[ch]) for ch in sorted_keys if counts[ch] > 1]
+
+        common_expr = " × ".join([f"{ch}({v}!)" for ch, v in common_items]) if common_items else "1"
+
+        common_fact = " \\times ".join([f"{v}!" for _, v in common_items]) if common_items else "1"
+
+        common_value = functools.reduce(
+            operator.mul, map(_fact, (v for _, v in common_items)), 1
+        )
+
+        # Everything up to the subcase math goes out as one markdown blob per
+        # step (a single ForwardMsg) instead of half a dozen separate calls.
+        body_parts = [position_md, pool_html, "Frequency Table:", freq_html]
+        if common_value > 1:
+            body_parts.append("**common_denominator:**")
+            body_parts.append(f"`{common_expr}`")
+
+        step = {
+            "title": title,
+            "body_md": None,
+            "subcase_latex": None,
+            "tail_md": None,
+        }
+
+        # Subcases for each UNIQUE smaller letter
+        subtotal = 0
+        subcase_latex_lines = []
+        final_latex_expr = r"\left("
+
+        multiplier = 0
+        counter_multiplier = 0
+
+        for smaller in smaller_letters:
+            remaining = len(right_slice) - 1
+
+            # Placing 'smaller' just divides the common denominator by its
+            # count, so the value and the factor need no factorial products:
+            # c!/(c-1)! = c.
+            actual_value = common_value // counts[smaller]
+
+            # Factor = (common denominator) / (actual denominator)
+            factor = counts[smaller]
+
+            # Borrow the slice Counter for this subcase instead of copying it
+            # and re-expanding its elements; restored below.
+            counts[smaller] -= 1
+
+            # Actual denominator (after placing 'smaller'); keep only freq > 1
+            actual_items = [(ch, counts[ch]) for ch in sorted_keys if counts[ch] > 1]
+            actual_fact = " \\times ".join([f"{v}!" for _, v in actual_items]) if actual_items else "1"
+
+            # Only the placed letter's token differs from the step's pool.
+            display_str = " ".join(
+                _subscript_token(ch, counts[ch]) if ch == smaller else tokens[ch]
+                for ch in sorted_keys
+                if counts[ch]
+            )
+
+            counts[smaller] += 1
+
+            remaining_html = _REMAIN_TMPL.format(pool=display_str)
+
+            # remaining!/common_value is exactly the multinomial already
+            # computed for this position in the tidy table.
+            count = factor * adjusted_values[i]
+
+            if factor > 1:
+                multiplier += factor
+                counter_multiplier += 1
+                if actual_value > 1:
+                    latex_expr = (
+                        f"{factor} \\times \\frac{{{remaining}!}}{{{common_fact}}} = "
+                        f"\\frac{{{remaining}!}}{{{actual_fact}}} = "
+                        f"{count}"
+                    )
+                    final_latex_expr += f"{factor}+"
+                else:
+                    latex_expr = (
+                        f"{factor} \\times \\frac{{{remaining}!}}{{{common_fact}}} = "
+                        f"{remaining}! = "
+                        f"{count}"
+                    )
+                    final_latex_expr += f"{factor}+"
+            else:
+                multiplier += 1
+                counter_multiplier += 1
+                if actual_value > 1:
+                    latex_expr = (
+                        f"\\frac{{{remaining}!}}{{{actual_fact}}} = "
+                        f"{count}"
+                    )
+                    final_latex_expr += f"{factor}+"
+                else:
+                    latex_expr = (
+                        f"{remaining}! = "
+                        f"{count}"
+                    )
+                    final_latex_expr += f"{factor}+"
+            subtotal += count
+
+            body_parts.append(f"### If **{smaller}** is placed instead of **{current}**:")
+            body_parts.append(remaining_html)
+            subcase_latex_lines.append(latex_expr)
+
+        if final_latex_expr.endswith("+"):
+            final_latex_expr = final_latex_expr[:-1]
+        if counter_multiplier == 1:
+            if final_latex_expr.startswith("\left("):
+                final_latex_expr = final_latex_expr[7:]
+            if multiplier == 1:
+                if common_value > 1:
+
+                    final_latex_expr += fr"\frac{{{remaining}!}}{{{common_fact}}} = "
+                    final_latex_expr += fr"{subtotal}"
+                else:
+
+                    final_latex_expr += fr"{remaining}! = "
+                    final_latex_expr += fr"{subtotal}"
+            else:
+                if common_value > 1:
+
+                    final_latex_expr += fr"{multiplier} \times \frac{{{remaining}!}}{{{common_fact}}} = "
+                    final_latex_expr += fr"{subtotal}"
+
+                else:
+
+                    final_latex_expr += fr"{remaining}! = "
+                    final_latex_expr += fr"{subtotal}"
+
+        else:
+            if common_value > 1:
+                final_latex_expr += fr"\right) \times \frac{{{remaining}!}}{{{common_fact}}} = "
+                final_latex_expr += fr"{multiplier} \times \frac{{{remaining}!}}{{{common_fact}}} = "
+                final_latex_expr += fr"{subtotal}"
+            else:
+                final_latex_expr += fr"\right) \times {remaining}! = "
+                final_latex_expr += fr"{multiplier} \times {remaining}! = "
+                final_latex_expr += fr"{subtotal}"
+
+        step["body_md"] = "\n\n".join(body_parts)
+        # All subcase math in one aligned block: one st.latex per step
+        # instead of one per smaller letter.
+        step["subcase_latex"] = (
+            "\\begin{aligned}\n& "
+            + " \\\\\n& ".join(subcase_latex_lines)
+            + "\n\\end{aligned}"
+        )
+        step["tail_md"] = (
+            f"{_HR_HTML}\n$$\n{final_latex_expr}\n$$\n\n"
+            + _SUBTOTAL_CARD_TMPL.format(pos=i + 1, sub=subtotal)
+        )
+        steps.append(step)
+        total_before += subtotal
+
+    return RankResult(df=df, total_rank=total_rank, total_before=total_before, steps=steps)